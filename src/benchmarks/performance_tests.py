@@ -2,10 +2,62 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 import numpy as np
 from crypto.hybrid_encryption import HybridECCAES
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: leave the function interpreted."""
+        def decorator(func):
+            return func
+        return decorator
+
+@njit(cache=True)
+def compute_throughput(sizes, times_ms):
+    """Throughput (bytes/second) for each payload size and its time in milliseconds."""
+    return sizes * 1000.0 / times_ms
+
+def _best_time_ms(func, number=10, repeat=5):
+    """
+    Best per-call time of func in milliseconds (minimum over repeat runs).
+    One untimed call warms OpenSSL's EC precomputation first; timeit keeps
+    GC disabled during each timed run.
+    """
+    func()
+    times = timeit.repeat(func, number=number, repeat=repeat)
+    return min(times) / number * 1000
+
+def _run_size_trial(size):
+    """Time an encrypt/decrypt round trip for a payload size (runs in a worker process)."""
+    hybrid_system = HybridECCAES()
+    test_data = bytes(size)  # Single zero-filled buffer, no str -> UTF-8 copy
+    
+    def round_trip():
+        encrypted_package = hybrid_system.encrypt_workload(
+            test_data, 
+            cloud_region="us-east-1", 
+            workload_type="benchmark"
+        )
+        hybrid_system.decrypt_workload(encrypted_package)
+    
+    return size, _best_time_ms(round_trip)
+
+def _run_curve_trial(curve):
+    """Time an encrypt/decrypt round trip on an ECC curve (runs in a worker process)."""
+    hybrid_system = HybridECCAES(ecc_curve=curve)
+    test_data = b"Cloud workload test data " * 100
+    
+    def round_trip():
+        encrypted_package = hybrid_system.encrypt_workload(test_data)
+        hybrid_system.decrypt_workload(encrypted_package)
+    
+    return curve, _best_time_ms(round_trip)
+
 class PerformanceBenchmark:
     def __init__(self):
         """Initialize benchmark suite."""
@@ -19,25 +71,15 @@ class PerformanceBenchmark:
         """
         print("🔬 Benchmarking Hybrid ECC-AES Performance...")
         
+        # Trials are independent, so run them across all cores
+        with ProcessPoolExecutor() as executor:
+            trial_results = list(executor.map(_run_size_trial, sizes))
+        
         ecc_times = []
         
-        for size in sizes:
-            # Generate test data
-            test_data = "A" * size
-            
-            # Benchmark ECC-AES
-            start_time = time.time()
-            encrypted_package = self.hybrid_system.encrypt_workload(
-                test_data, 
-                cloud_region="us-east-1", 
-                workload_type="benchmark"
-            )
-            decrypted_result = self.hybrid_system.decrypt_workload(encrypted_package)
-            ecc_time = time.time() - start_time
-            
-            ecc_times.append(ecc_time * 1000)  # Convert to milliseconds
-            
-            print(f"Data size: {size:,} bytes, ECC-AES time: {ecc_time*1000:.2f}ms")
+        for size, ecc_time in trial_results:
+            ecc_times.append(ecc_time)
+            print(f"Data size: {size:,} bytes, ECC-AES time: {ecc_time:.2f}ms")
         
         self.results['sizes'] = sizes
         self.results['ecc_times'] = ecc_times
@@ -48,35 +90,81 @@ class PerformanceBenchmark:
         """
         NOVELTY: Compare different ECC curves for cloud workloads.
         """
-        curves = ["secp256r1", "secp384r1", "secp521r1"]
-        test_data = "Cloud workload test data " * 100
+        curves = ["secp256r1", "secp384r1", "secp521r1", "x25519"]
+        
+        with ProcessPoolExecutor() as executor:
+            trial_results = list(executor.map(_run_curve_trial, curves))
         
         curve_results = {}
         
-        for curve in curves:
-            hybrid_system = HybridECCAES(ecc_curve=curve)
-            
-            start_time = time.time()
-            encrypted_package = hybrid_system.encrypt_workload(test_data)
-            decrypted_result = hybrid_system.decrypt_workload(encrypted_package)
-            total_time = time.time() - start_time
-            
-            curve_results[curve] = total_time * 1000
-            print(f"Curve {curve}: {total_time*1000:.2f}ms")
+        for curve, total_time in trial_results:
+            curve_results[curve] = total_time
+            print(f"Curve {curve}: {total_time:.2f}ms")
         
         return curve_results
     
+    def benchmark_keygen_amortization(self, size=1024, iterations=50):
+        """
+        NOVELTY: Measure how much of the per-workload cost is ECC key generation.
+        Compares a fresh ephemeral key per workload against a cached key pair.
+        """
+        test_data = bytes(size)
+        
+        # Systems are built outside the timed region
+        systems = {
+            "fresh_keypair": HybridECCAES(),
+            "keygen_amortized": HybridECCAES(reuse_ephemeral_key=True)
+        }
+        
+        amortization_results = {}
+        
+        for mode, hybrid_system in systems.items():
+            start_time = time.perf_counter_ns()
+            for _ in range(iterations):
+                encrypted_package = hybrid_system.encrypt_workload(test_data)
+                hybrid_system.decrypt_workload(encrypted_package)
+            avg_ms = (time.perf_counter_ns() - start_time) / iterations / 1e6
+            
+            amortization_results[mode] = avg_ms
+            print(f"{mode}: {avg_ms:.2f}ms per workload")
+        
+        return amortization_results
+    
+    def benchmark_batch_mode(self, size=64, count=200):
+        """
+        NOVELTY: Compare single-shot encryption against session batch encryption.
+        Small payloads are dominated by per-call setup, which batching amortizes.
+        """
+        hybrid_system = HybridECCAES()
+        items = [bytes(size)] * count
+        
+        start_time = time.perf_counter_ns()
+        for item in items:
+            hybrid_system.encrypt_workload(item)
+        single_ms = (time.perf_counter_ns() - start_time) / 1e6
+        
+        start_time = time.perf_counter_ns()
+        hybrid_system.encrypt_batch(items)
+        batch_ms = (time.perf_counter_ns() - start_time) / 1e6
+        
+        print(f"{count} x {size} bytes, single-shot: {single_ms:.2f}ms, batch: {batch_ms:.2f}ms")
+        
+        return {"single_shot": single_ms, "batch": batch_ms}
+    
     def plot_performance_results(self):
         """Visualize benchmark results."""
         if 'sizes' not in self.results:
             print("No benchmark data available. Run benchmark_encryption_sizes() first.")
             return
         
+        sizes = np.asarray(self.results['sizes'], dtype=np.float64)
+        times_ms = np.asarray(self.results['ecc_times'], dtype=np.float64)
+        
         plt.figure(figsize=(12, 8))
         
         # Plot 1: Encryption time vs data size
         plt.subplot(2, 2, 1)
-        plt.plot(self.results['sizes'], self.results['ecc_times'], 'bo-', label='Hybrid ECC-AES')
+        plt.plot(sizes, times_ms, 'bo-', label='Hybrid ECC-AES')
         plt.xlabel('Data Size (bytes)')
         plt.ylabel('Encryption Time (ms)')
         plt.title('Encryption Performance vs Data Size')
@@ -85,8 +173,9 @@ class PerformanceBenchmark:
         
         # Plot 2: Throughput
         plt.subplot(2, 2, 2)
-        throughput = [size / (time/1000) for size, time in zip(self.results['sizes'], self.results['ecc_times'])]
-        plt.plot(self.results['sizes'], throughput, 'ro-')
+        throughput = compute_throughput(sizes, times_ms)
+        plt.plot(sizes, throughput, 'ro-')
+        plt.yscale('log')
         plt.xlabel('Data Size (bytes)')
         plt.ylabel('Throughput (bytes/second)')
         plt.title('Encryption Throughput')
@@ -1,6 +1,23 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 import boto3
-import json
+import functools
+import io
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from crypto.hybrid_encryption import HybridECCAES
+
+# Shared by every handler so connections and resolved credentials are reused
+_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'adaptive'}
+)
+
+@functools.lru_cache(maxsize=16)
+def _client(service_name, region_name):
+    """Return a cached boto3 client per (service, region)."""
+    return boto3.client(service_name, region_name=region_name, config=_CLIENT_CONFIG)
 
 class AWSCloudHandler:
     def __init__(self, region_name='us-east-1', use_simulation=True):
@@ -10,32 +27,43 @@ class AWSCloudHandler:
         
         if not use_simulation:
             # Only create real AWS clients if you have credentials
-            self.s3_client = boto3.client('s3', region_name=region_name)
-            self.ec2_client = boto3.client('ec2', region_name=region_name)
+            self.s3_client = _client('s3', region_name)
+            self.ec2_client = _client('ec2', region_name)
         else:
             print(f"🧪 AWS Handler in simulation mode for region: {region_name}")
     
-    def upload_encrypted_workload(self, bucket_name, workload_package, object_key):
-        """Upload encrypted workload to S3 (or simulate)."""
+    def upload_encrypted_workload(self, bucket_name, workload_package, object_key, body=None):
+        """
+        Upload encrypted workload to S3 (or simulate).
+        
+        Pass body if the caller already serialized workload_package, so the
+        package is serialized only once.
+        """
+        if body is None:
+            body = HybridECCAES.serialize_package(workload_package)
+        
         if self.use_simulation:
             # Simulate upload without real AWS
             print(f"📤 [SIMULATED] Uploading to s3://{bucket_name}/{object_key}")
-            print(f"   Workload size: {len(str(workload_package))} bytes")
+            print(f"   Workload size: {len(body)} bytes")
             print(f"   Region: {self.region_name}")
             return f"s3://{bucket_name}/{object_key}"
         else:
             # Real AWS upload (requires credentials)
             try:
-                workload_json = json.dumps(workload_package)
-                self.s3_client.put_object(
-                    Bucket=bucket_name,
-                    Key=object_key,
-                    Body=workload_json,
-                    ServerSideEncryption='AES256',
-                    Metadata={
-                        'cloud-region': workload_package.get('cloud_region', ''),
-                        'workload-type': workload_package.get('workload_type', ''),
-                        'encryption-method': 'hybrid-ecc-aes'
+                # Transfer manager switches to threaded multipart for large bodies
+                self.s3_client.upload_fileobj(
+                    io.BytesIO(body),
+                    bucket_name,
+                    object_key,
+                    ExtraArgs={
+                        'ServerSideEncryption': 'AES256',
+                        'ContentType': 'application/cbor',
+                        'Metadata': {
+                            'cloud-region': workload_package.get('cloud_region', ''),
+                            'workload-type': workload_package.get('workload_type', ''),
+                            'encryption-method': 'hybrid-ecc-aes'
+                        }
                     }
                 )
                 return f"s3://{bucket_name}/{object_key}"
@@ -48,7 +76,7 @@ class AWSCloudHandler:
             print(f"📥 [SIMULATED] Downloading from s3://{bucket_name}/{object_key}")
             # Return a dummy encrypted package for testing
             return {
-                "encrypted_data": "simulated_encrypted_data",
+                "encrypted_data": b"simulated_encrypted_data",
                 "cloud_region": self.region_name,
                 "workload_type": "simulated"
             }
@@ -56,8 +84,7 @@ class AWSCloudHandler:
             # Real AWS download
             try:
                 response = self.s3_client.get_object(Bucket=bucket_name, Key=object_key)
-                workload_json = response['Body'].read().decode('utf-8')
-                return json.loads(workload_json)
+                return HybridECCAES.deserialize_package(response['Body'].read())
             except Exception as e:
                 raise Exception(f"Failed to download from S3: {e}")
     
@@ -1,72 +1,263 @@
-from Crypto.Cipher import AES
-from Crypto.Random import get_random_bytes
-from Crypto.Util.Padding import pad, unpad
-import base64
-import hashlib
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+import logging
+import mmap
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# AEAD constructions and key sizes (bytes), by the name recorded in workload packages
+_AEAD_CIPHERS = {
+    "aes-128-gcm": (AESGCM, 16),
+    "aes-192-gcm": (AESGCM, 24),
+    "aes-256-gcm": (AESGCM, 32),
+    "chacha20-poly1305": (ChaCha20Poly1305, 32)
+}
+_logger = logging.getLogger(__name__)
+_reported_backend = []
+
+def _cpu_has_aes():
+    """
+    Probe /proc/cpuinfo for AES instructions (x86 AES-NI, ARMv8 crypto extensions).
+    Returns None where the platform does not expose CPU flags.
+    """
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                name, _, value = line.partition(":")
+                if name.strip().lower() in ("flags", "features"):
+                    return "aes" in value.split()
+    except OSError:
+        pass
+    return None
+
+_HAS_AES_HW = _cpu_has_aes()
+
+class _RandPool:
+    """
+    Pre-drawn os.urandom buffer sliced into nonces, refilled when exhausted.
+    Thread-safe, and refilled in forked children so processes never share bytes.
+    """
+    def __init__(self, size=4096):
+        self._size = size
+        self._lock = threading.Lock()
+        self._refill()
+    
+    def _refill(self):
+        self._buf = os.urandom(self._size)
+        self._off = 0
+    
+    def _after_fork(self):
+        # The parent's lock may have been held by another thread at fork time
+        self._lock = threading.Lock()
+        self._refill()
+    
+    def draw(self, n):
+        """Return n fresh random bytes; every byte is handed out at most once."""
+        if n > self._size:
+            return os.urandom(n)
+        
+        with self._lock:
+            if self._off + n > self._size:
+                self._refill()
+            chunk = self._buf[self._off:self._off + n]
+            self._off += n
+        return chunk
+
+_rand_pool = _RandPool()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_rand_pool._after_fork)
 
 class AESManager:
-    def __init__(self, key_size=256):
-        """Initialize AES manager."""
-        self.key_size = key_size // 8  # Convert bits to bytes
-        self.block_size = AES.block_size
+    def __init__(self, key_size=256, aead=None):
+        """
+        Initialize AES manager.
+        
+        aead picks the workload cipher ("aes-gcm" or "chacha20-poly1305"). By
+        default AES-GCM is used unless the CPU is known to lack AES instructions,
+        where ChaCha20-Poly1305 is faster than software AES. ChaCha20 only has
+        256-bit keys: asking for it with another key_size raises ValueError,
+        and the automatic choice stays on AES-GCM for key sizes other than 256.
+        File encryption stays on AES-CTR either way.
+        The resolved name, with the AES key size ("aes-128-gcm"), is self.backend.
+        """
+        if aead is None:
+            aead = "chacha20-poly1305" if _HAS_AES_HW is False and key_size == 256 else "aes-gcm"
+        if aead == "chacha20-poly1305" and key_size != 256:
+            raise ValueError(f"chacha20-poly1305 requires a 256-bit key, got key_size={key_size}")
+        if aead == "aes-gcm":
+            aead = f"aes-{key_size}-gcm"
+        
+        self.backend = aead
+        self.key_size = self.aead_key_size(aead)
+        self.block_size = algorithms.AES.block_size // 8
+        self.nonce_size = 12  # 96-bit nonce, the native size for GCM
+        self.tag_size = 16  # Same nonce and tag sizes for both AEAD ciphers
+        
+        if not _reported_backend:
+            _reported_backend.append(aead)
+            hw = {True: "AES instructions available", False: "no AES instructions", None: "CPU flags unknown"}
+            _logger.info("AEAD backend: %s (%s)", aead, hw[_HAS_AES_HW])
     
     def generate_aes_key(self):
         """Generate random AES key."""
-        return get_random_bytes(self.key_size)
+        return AESGCM.generate_key(bit_length=self.key_size * 8)
+    
+    def create_cipher(self, key, aead=None):
+        """
+        Create a reusable AEAD context (key schedule is expanded once).
+        aead overrides this manager's cipher, e.g. for a package from another host.
+        """
+        aead = aead or self.backend
+        if aead not in _AEAD_CIPHERS:
+            raise ValueError(f"Unsupported AEAD cipher: {aead}")
+        return _AEAD_CIPHERS[aead][0](key)
     
-    def encrypt_data(self, data, key):
-        """Encrypt data using AES-CBC."""
+    @staticmethod
+    def aead_key_size(aead):
+        """Key size in bytes for an AEAD name, e.g. one read from another host's package."""
+        if aead not in _AEAD_CIPHERS:
+            raise ValueError(f"Unsupported AEAD cipher: {aead}")
+        return _AEAD_CIPHERS[aead][1]
+    
+    def encrypt_data(self, data, key, associated_data=None):
+        """
+        Encrypt data using AES-GCM; associated_data is authenticated but not encrypted.
+        Returns raw nonce + ciphertext + tag as bytes.
+        """
+        return self.encrypt_with_cipher(self.create_cipher(key), data, associated_data)
+    
+    def decrypt_data(self, encrypted_data, key, associated_data=None):
+        """Decrypt AES-GCM-encrypted data given as raw nonce + ciphertext bytes; returns bytes."""
+        return self.decrypt_with_cipher(self.create_cipher(key), encrypted_data, associated_data)
+    
+    def encrypt_with_cipher(self, cipher, data, associated_data=None):
+        """Encrypt data with an existing AES-GCM context; returns nonce + ciphertext + tag as bytes."""
         # Convert string to bytes if necessary
         if isinstance(data, str):
             data = data.encode('utf-8')
         
-        # Generate random IV
-        iv = get_random_bytes(self.block_size)
-        
-        # Create cipher and encrypt
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-        padded_data = pad(data, self.block_size)
-        encrypted_data = cipher.encrypt(padded_data)
+        # Generate random nonce
+        nonce = _rand_pool.draw(self.nonce_size)
         
-        # Combine IV and encrypted data
-        result = iv + encrypted_data
-        return base64.b64encode(result).decode('utf-8')
+        # Encrypt and authenticate (GCM appends the 16-byte tag, no padding needed)
+        return nonce + cipher.encrypt(nonce, data, associated_data)
     
-    def decrypt_data(self, encrypted_data, key):
-        """Decrypt AES-encrypted data."""
-        # Decode base64
-        encrypted_bytes = base64.b64decode(encrypted_data.encode('utf-8'))
+    def decrypt_with_cipher(self, cipher, encrypted_data, associated_data=None):
+        """
+        Decrypt raw nonce + ciphertext bytes with an existing AES-GCM context.
+        Raises cryptography.exceptions.InvalidTag if data or associated_data was altered.
+        """
+        # Extract nonce and encrypted data without copying the ciphertext
+        view = memoryview(encrypted_data)
+        nonce = view[:self.nonce_size]
+        encrypted_content = view[self.nonce_size:]
         
-        # Extract IV and encrypted data
-        iv = encrypted_bytes[:self.block_size]
-        encrypted_content = encrypted_bytes[self.block_size:]
-        
-        # Decrypt
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-        decrypted_padded = cipher.decrypt(encrypted_content)
-        decrypted_data = unpad(decrypted_padded, self.block_size)
-        
-        return decrypted_data.decode('utf-8')
+        # Decrypt and verify the authentication tag
+        return cipher.decrypt(nonce, encrypted_content, associated_data)
     
-    def encrypt_file(self, file_path, key, output_path=None):
-        """Encrypt a file using AES."""
+    def encrypt_file(self, file_path, key, output_path=None, chunk_size=1 << 20, digest=None):
+        """
+        Encrypt a file using AES-CTR, streaming through one cipher context.
+        If digest (a hashlib object) is given, it is updated with every output
+        byte in the same pass, so the ciphertext never has to be re-read to hash it.
+        """
         if output_path is None:
             output_path = file_path + '.encrypted'
         
-        iv = get_random_bytes(self.block_size)
-        cipher = AES.new(key, AES.MODE_CBC, iv)
+        # CTR only needs a unique initial counter block, no padding
+        nonce = _rand_pool.draw(self.block_size)
+        encryptor = Cipher(algorithms.AES(key), modes.CTR(nonce)).encryptor()
+        
+        # Reuse the same buffers for every chunk (1 MiB by default)
+        in_buf = bytearray(chunk_size)
+        in_view = memoryview(in_buf)
+        out_buf = bytearray(chunk_size + self.block_size - 1)
+        out_view = memoryview(out_buf)
         
         with open(file_path, 'rb') as infile, open(output_path, 'wb') as outfile:
-            outfile.write(iv)  # Write IV first
+            outfile.write(nonce)  # Write nonce first
+            if digest is not None:
+                digest.update(nonce)
             
             while True:
-                chunk = infile.read(8192)  # 8KB chunks
-                if len(chunk) == 0:
+                n = infile.readinto(in_view)
+                if not n:
                     break
-                elif len(chunk) % self.block_size != 0:
-                    chunk = pad(chunk, self.block_size)
                 
-                encrypted_chunk = cipher.encrypt(chunk)
-                outfile.write(encrypted_chunk)
+                written = encryptor.update_into(in_view[:n], out_view)
+                outfile.write(out_view[:written])
+                if digest is not None:
+                    digest.update(out_view[:written])
+            
+            tail = encryptor.finalize()
+            outfile.write(tail)
+            if digest is not None:
+                digest.update(tail)
+        
+        return output_path
+    
+    def encrypt_file_parallel(self, file_path, key, output_path=None, chunk_size=16 << 20,
+                              max_workers=None, digest=None, max_in_flight_bytes=256 << 20):
+        """
+        Encrypt a file using AES-CTR split into chunks with disjoint counter
+        ranges, encrypted concurrently. The output format (and, for the same
+        nonce, every byte) matches encrypt_file().
+        At most max_in_flight_bytes of ciphertext (and never fewer than one
+        chunk) wait to be written, however many workers there are.
+        """
+        if output_path is None:
+            output_path = file_path + '.encrypted'
+        
+        file_size = os.path.getsize(file_path)
+        if file_size == 0:
+            # Nothing to split, and an empty file cannot be memory-mapped
+            return self.encrypt_file(file_path, key, output_path, digest=digest)
+        
+        # Each chunk must start on a block boundary so its counter is exact
+        chunk_size = max(chunk_size - chunk_size % self.block_size, self.block_size)
+        max_workers = max_workers or os.cpu_count() or 1
+        window = max(1, min(2 * max_workers, max_in_flight_bytes // chunk_size))
+        
+        nonce = _rand_pool.draw(self.block_size)
+        base_counter = int.from_bytes(nonce, 'big')
+        algorithm = algorithms.AES(key)
+        
+        with open(file_path, 'rb') as infile, \
+                mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                open(output_path, 'wb') as outfile:
+            source = memoryview(mapped)
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            
+            def encrypt_chunk(offset):
+                # Counter block for this chunk = initial counter + blocks before it
+                counter = (base_counter + offset // self.block_size) % (1 << 128)
+                encryptor = Cipher(algorithm, modes.CTR(counter.to_bytes(self.block_size, 'big'))).encryptor()
+                chunk = encryptor.update(source[offset:offset + chunk_size])
+                encryptor.finalize()  # CTR has no tail, so no concatenated copy
+                return chunk
+            
+            def write(chunk):
+                outfile.write(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+            
+            try:
+                write(nonce)  # Write nonce first
+                
+                # Keep a bounded window of chunks in flight and write them back in order
+                pending = deque()
+                for offset in range(0, file_size, chunk_size):
+                    pending.append(executor.submit(encrypt_chunk, offset))
+                    if len(pending) >= window:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+            finally:
+                # On error, drop queued chunks and let running ones finish, so no
+                # worker still reads the view when it is released and unmapped
+                executor.shutdown(wait=True, cancel_futures=True)
+                source.release()
         
         return output_path
@@ -1,39 +1,104 @@
 from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.kdf.hkdf import HKDF
-from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature, decode_dss_signature
+from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature, decode_dss_signature, Prehashed
+from cryptography.hazmat.backends.openssl.backend import backend as openssl_backend
 import os
-import base64
+import hashlib
+import hmac
+import logging
+
+# HKDF-SHA256 with salt=None uses a zero-filled salt of hash length (RFC 5869)
+_HKDF_ZERO_SALT = b"\x00" * hashlib.sha256().digest_size
+
+# OpenSSL 3.x is required for the windowed-comb P-256 method with precomputed tables
+_MIN_OPENSSL_VERSION = 0x30000000
+_FAST_PATH_CURVES = {
+    "secp256r1": "nistz256 precomputed tables",
+    "x25519": "constant-time Montgomery ladder",
+    "ed25519": "constant-time Edwards arithmetic"
+}
+_logger = logging.getLogger(__name__)
+_reported_curves = set()
 
 class ECCManager:
-    def __init__(self, curve_type="secp256r1"):
-        """Initialize ECC manager with specified curve."""
+    def __init__(self, curve_type="x25519"):
+        """
+        Initialize ECC manager with specified curve.
+        
+        Defaults to X25519 for ECDH; pass a NIST curve name when NIST
+        compliance or ECDSA signing with the same key is required.
+        "ed25519" gives a signing-only manager to pair with X25519.
+        """
         self.curve_map = {
             "secp256r1": ec.SECP256R1(),
             "secp384r1": ec.SECP384R1(),
-            "secp521r1": ec.SECP521R1()
+            "secp521r1": ec.SECP521R1(),
+            "x25519": None,  # Not short-Weierstrass curves, handled separately
+            "ed25519": None
         }
         self.curve = self.curve_map.get(curve_type, ec.SECP256R1())
+        self.curve_type = curve_type if curve_type in self.curve_map else "secp256r1"
+        self.is_x25519 = self.curve_type == "x25519"
+        self.is_ed25519 = self.curve_type == "ed25519"
+        self.supports_signing = not self.is_x25519  # X25519 keys are ECDH-only
+        self.fast_path = _FAST_PATH_CURVES.get(self.curve_type)
+        self._check_backend()
+        self._cached_kp = None
+        self._hkdf_info = b'cloud-workload-encryption'
+        
+    def _check_backend(self):
+        """Ensure OpenSSL provides the fast EC paths and report them once per curve."""
+        if openssl_backend.openssl_version_number() < _MIN_OPENSSL_VERSION:
+            raise RuntimeError(
+                f"OpenSSL 3.x or newer is required, found {openssl_backend.openssl_version_text()}"
+            )
+        
+        if self.curve_type not in _reported_curves:
+            _reported_curves.add(self.curve_type)
+            path = self.fast_path or "generic implementation"
+            _logger.info("%s: %s using %s", openssl_backend.openssl_version_text(), self.curve_type, path)
         
     def generate_key_pair(self):
         """Generate ECC key pair."""
-        private_key = ec.generate_private_key(self.curve)
+        if self.is_x25519:
+            private_key = X25519PrivateKey.generate()
+        elif self.is_ed25519:
+            private_key = Ed25519PrivateKey.generate()
+        else:
+            private_key = ec.generate_private_key(self.curve)
         public_key = private_key.public_key()
         return private_key, public_key
     
+    def get_or_create_keypair(self):
+        """Return a key pair generated once and reused on later calls."""
+        if self._cached_kp is None:
+            self._cached_kp = self.generate_key_pair()
+        return self._cached_kp
+    
     def derive_shared_key(self, private_key, peer_public_key, key_length=32):
         """Derive shared key using ECDH."""
-        shared_key = private_key.exchange(ec.ECDH(), peer_public_key)
+        if self.is_ed25519:
+            raise ValueError("Ed25519 keys are signing-only; use x25519 for key agreement")
+        if self.is_x25519:
+            shared_key = private_key.exchange(peer_public_key)
+        else:
+            shared_key = private_key.exchange(ec.ECDH(), peer_public_key)
         
-        # Derive AES key from shared secret
-        derived_key = HKDF(
-            algorithm=hashes.SHA256(),
-            length=key_length,
-            salt=None,
-            info=b'cloud-workload-encryption'
-        ).derive(shared_key)
+        # Derive AES key from shared secret: HKDF-SHA256 extract-then-expand,
+        # inlined over stdlib hmac/hashlib to skip building an HKDF object per call
+        prk = hmac.new(_HKDF_ZERO_SALT, shared_key, hashlib.sha256).digest()
         
-        return derived_key
+        okm = b""
+        block = b""
+        counter = 1
+        while len(okm) < key_length:
+            block = hmac.new(prk, block + self._hkdf_info + bytes([counter]), hashlib.sha256).digest()
+            okm += block
+            counter += 1
+        
+        return okm[:key_length]
     
     def serialize_public_key(self, public_key):
         """Serialize public key for transmission."""
@@ -46,16 +111,31 @@ class ECCManager:
         """Deserialize public key from bytes."""
         return serialization.load_pem_public_key(public_key_bytes)
     
-    def sign_data(self, private_key, data):
-        """Sign data using ECDSA."""
-        signature = private_key.sign(data, ec.ECDSA(hashes.SHA256()))
-        return base64.b64encode(signature).decode('utf-8')
+    def _signature_algorithm(self, prehashed):
+        """ECDSA-SHA256, over raw data or over a SHA-256 digest the caller computed."""
+        if prehashed:
+            return ec.ECDSA(Prehashed(hashes.SHA256()))
+        return ec.ECDSA(hashes.SHA256())
+    
+    def sign_data(self, private_key, data, prehashed=False):
+        """
+        Sign data using ECDSA or Ed25519; with prehashed=True, data is already a SHA-256 digest.
+        Ed25519 hashes internally, so a digest is simply signed as the message.
+        Returns the raw signature bytes.
+        """
+        if self.is_ed25519:
+            signature = private_key.sign(data)
+        else:
+            signature = private_key.sign(data, self._signature_algorithm(prehashed))
+        return signature
     
-    def verify_signature(self, public_key, data, signature):
-        """Verify ECDSA signature."""
+    def verify_signature(self, public_key, data, signature, prehashed=False):
+        """Verify an ECDSA or Ed25519 signature; with prehashed=True, data is already a SHA-256 digest."""
         try:
-            signature_bytes = base64.b64decode(signature.encode('utf-8'))
-            public_key.verify(signature_bytes, data, ec.ECDSA(hashes.SHA256()))
+            if self.is_ed25519:
+                public_key.verify(signature, data)
+            else:
+                public_key.verify(signature, data, self._signature_algorithm(prehashed))
             return True
         except Exception:
             return False
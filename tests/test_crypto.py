@@ -0,0 +1,237 @@
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from crypto import aes_manager
+from crypto.aes_manager import AESManager
+from crypto.hybrid_encryption import HybridECCAES
+
+class FixedNonce:
+    """Stand-in for the module nonce pool, so two encryptions share a counter block."""
+    def __init__(self, nonce):
+        self.nonce = nonce
+
+    def draw(self, n):
+        return self.nonce[:n]
+
+class ParallelCTRTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = AESManager()
+        self.key = self.manager.generate_aes_key()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _write(self, data):
+        path = os.path.join(self.tmpdir.name, "plain.bin")
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def _encrypt_both(self, data, nonce, **parallel_kwargs):
+        path = self._write(data)
+        with mock.patch.object(aes_manager, "_rand_pool", FixedNonce(nonce)):
+            serial = self.manager.encrypt_file(path, self.key, output_path=path + ".serial")
+            parallel = self.manager.encrypt_file_parallel(path, self.key, output_path=path + ".parallel",
+                                                          **parallel_kwargs)
+        with open(serial, 'rb') as a, open(parallel, 'rb') as b:
+            return a.read(), b.read()
+
+    def test_parallel_matches_serial_across_chunk_boundaries(self):
+        for size in (0, 1, 16, 4099, 3 * 4096 + 7):
+            serial, parallel = self._encrypt_both(os.urandom(size), os.urandom(16),
+                                                  chunk_size=4096 + 3, max_workers=3)
+            self.assertEqual(serial, parallel, size)
+
+    def test_counter_wraps_modulo_2_128(self):
+        serial, parallel = self._encrypt_both(os.urandom(200), b"\xff" * 15 + b"\xfe", chunk_size=32)
+        self.assertEqual(serial, parallel)
+
+    def test_small_byte_budget_still_encrypts_everything(self):
+        serial, parallel = self._encrypt_both(os.urandom(10000), os.urandom(16),
+                                              chunk_size=1024, max_workers=8, max_in_flight_bytes=1)
+        self.assertEqual(serial, parallel)
+
+    def test_digest_covers_written_ciphertext(self):
+        path = self._write(os.urandom(5000))
+        digest = hashlib.sha256()
+        out = self.manager.encrypt_file_parallel(path, self.key, chunk_size=1024, digest=digest)
+        with open(out, 'rb') as f:
+            self.assertEqual(digest.digest(), hashlib.sha256(f.read()).digest())
+
+    def test_write_error_propagates_after_workers_stop(self):
+        class FailingDigest:
+            def update(self, chunk):
+                if len(chunk) > 16:
+                    raise OSError("disk full")
+
+        path = self._write(os.urandom(64 * 1024))
+        with self.assertRaises(OSError):
+            self.manager.encrypt_file_parallel(path, self.key, chunk_size=1024, max_workers=4,
+                                               digest=FailingDigest())
+
+class CanonicalBytesTest(unittest.TestCase):
+    def setUp(self):
+        self.hybrid = HybridECCAES()
+        self.package = self.hybrid.encrypt_workload("payload")
+
+    def test_round_trip_after_cbor(self):
+        restored = self.hybrid.deserialize_package(self.hybrid.serialize_package(self.package))
+        self.assertEqual(self.hybrid.decrypt_workload(restored)["data"], "payload")
+
+    def test_type_swap_with_same_bytes_is_rejected(self):
+        forged = dict(self.package)
+        forged["timestamp"] = struct.unpack(">Q", struct.pack(">d", self.package["timestamp"]))[0]
+        self.assertNotEqual(self.hybrid._canonical_bytes(forged), self.hybrid._canonical_bytes(self.package))
+        with self.assertRaises(ValueError):
+            self.hybrid.decrypt_workload(forged)
+
+    def test_adjacent_fields_cannot_reslice(self):
+        forged = dict(self.package)
+        forged["binary_payload"] = 0
+        forged["timestamp"] = False
+        self.assertNotEqual(self.hybrid._canonical_bytes(forged), self.hybrid._canonical_bytes(self.package))
+
+    def test_subclasses_encode_as_base_type(self):
+        class Stamp(float):
+            pass
+
+        package = dict(self.package, timestamp=Stamp(self.package["timestamp"]))
+        self.assertEqual(self.hybrid._canonical_bytes(package), self.hybrid._canonical_bytes(self.package))
+
+    def test_unsupported_type_is_rejected(self):
+        with self.assertRaises(TypeError):
+            self.hybrid._canonical_bytes(dict(self.package, timestamp=[1]))
+
+    def test_batch_header_includes_item_count(self):
+        batch = self.hybrid.encrypt_batch(["a", "b"])
+        batch["item_count"] = 3
+        batch["encrypted_items"].append(batch["encrypted_items"][0])
+        with self.assertRaises(ValueError):
+            self.hybrid.decrypt_batch(batch)
+
+class CrossBackendTest(unittest.TestCase):
+    def test_decrypts_across_aead_and_key_size(self):
+        for local, remote in (({"aes_key_size": 128, "aead": "aes-gcm"}, {"aead": "chacha20-poly1305"}),
+                              ({"aead": "chacha20-poly1305"}, {"aes_key_size": 128, "aead": "aes-gcm"}),
+                              ({"aes_key_size": 192}, {"aes_key_size": 256})):
+            receiver = HybridECCAES(**local)
+            sender = HybridECCAES(**remote)
+            sender.server_public_key = receiver.server_public_key
+            package = sender.encrypt_workload("payload")
+            self.assertEqual(receiver.decrypt_workload(package)["data"], "payload", (local, remote))
+
+    def test_aead_choice_changes_derived_key(self):
+        hybrid = HybridECCAES()
+        pem = hybrid._serialize_public_key(hybrid.ecc_manager.generate_key_pair()[1])
+        (aes_key, _), _ = hybrid._session_key(pem, "us-east-1", "compute", "aes-256-gcm")
+        (chacha_key, _), _ = hybrid._session_key(pem, "us-east-1", "compute", "chacha20-poly1305")
+        self.assertNotEqual(aes_key, chacha_key)
+
+    def test_chacha_rejects_other_key_sizes(self):
+        with self.assertRaises(ValueError):
+            HybridECCAES(aes_key_size=128, aead="chacha20-poly1305")
+
+    def test_automatic_choice_keeps_requested_aes_key_size(self):
+        with mock.patch.object(aes_manager, "_HAS_AES_HW", False):
+            self.assertEqual(AESManager(128).backend, "aes-128-gcm")
+            self.assertEqual(AESManager().backend, "chacha20-poly1305")
+
+    def test_unknown_aead_is_rejected(self):
+        hybrid = HybridECCAES()
+        package = dict(hybrid.encrypt_workload("payload"), aead="aes-100-gcm")
+        with self.assertRaises(ValueError):
+            hybrid.decrypt_workload(package)
+
+class SessionCacheTest(unittest.TestCase):
+    def test_fresh_client_keys_are_not_cached(self):
+        hybrid = HybridECCAES()
+        for _ in range(50):
+            hybrid.decrypt_workload(hybrid.encrypt_workload("payload"))
+        self.assertEqual(len(hybrid._session_cache), 0)
+        self.assertEqual(len(hybrid._prk_cache), 0)
+
+    def test_reused_client_key_is_cached_from_second_package(self):
+        sender = HybridECCAES(reuse_ephemeral_key=True)
+        receiver = HybridECCAES()
+        sender.server_private_key, sender.server_public_key = receiver.server_private_key, receiver.server_public_key
+        receiver.decrypt_workload(sender.encrypt_workload("a"))
+        self.assertEqual(len(receiver._session_cache), 0)
+        receiver.decrypt_workload(sender.encrypt_workload("b"))
+        self.assertEqual(len(receiver._session_cache), 1)
+        self.assertEqual(receiver.decrypt_workload(sender.encrypt_workload("c"))["data"], "c")
+
+    def test_forged_packages_leave_caches_empty(self):
+        sender = HybridECCAES(reuse_ephemeral_key=True)
+        receiver = HybridECCAES()
+        sender.server_private_key, sender.server_public_key = receiver.server_private_key, receiver.server_public_key
+        for _ in range(3):
+            forged = dict(sender.encrypt_workload("payload"), cloud_region="eu-west-1")
+            with self.assertRaises(ValueError):
+                receiver.decrypt_workload(forged)
+        self.assertEqual(len(receiver._session_cache), 0)
+        self.assertEqual(len(receiver._prk_cache), 0)
+        self.assertEqual(len(receiver._seen_clients), 0)
+
+class PackageValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.hybrid = HybridECCAES()
+
+    def test_signature_only_curve_is_rejected(self):
+        with self.assertRaises(ValueError):
+            HybridECCAES(ecc_curve="ed25519")
+
+    def test_mixed_batch_is_rejected(self):
+        with self.assertRaises(TypeError):
+            self.hybrid.encrypt_batch(["text", b"bytes"])
+
+    def test_invalid_client_key_raises_value_error(self):
+        package = self.hybrid.encrypt_workload("payload")
+        other_curve = HybridECCAES(ecc_curve="secp256r1")
+        foreign_pem = other_curve._serialize_public_key(other_curve.server_public_key)
+        for client_public_key in (b"not a key", foreign_pem):
+            with self.assertRaises(ValueError):
+                self.hybrid.decrypt_workload(dict(package, client_public_key=client_public_key))
+
+class MerkleAttestationTest(unittest.TestCase):
+    def setUp(self):
+        self.hybrid = HybridECCAES()
+        self.packages = self.hybrid.encrypt_workloads_batch([b"a", b"b", b"c"], max_workers=1)
+        self.attestation = self.hybrid.finalize_batch(self.packages)
+
+    def _leaf(self, package):
+        header = self.hybrid._canonical_bytes(package)
+        ciphertext = package["encrypted_data"]
+        inner = hashlib.sha256(header + struct.pack(">Q", len(ciphertext)) + ciphertext).digest()
+        return hashlib.sha256(b"\x00" + inner).digest()
+
+    def test_root_layout(self):
+        a, b, c = (self._leaf(p) for p in self.packages)
+        # Odd node is promoted unchanged, not duplicated
+        expected = hashlib.sha256(b"\x01" + hashlib.sha256(b"\x01" + a + b).digest() + c).digest()
+        self.assertEqual(self.attestation["merkle_root"], expected)
+
+    def test_verify_accepts_exact_list(self):
+        self.assertTrue(self.hybrid.verify_batch(self.packages, self.attestation))
+        results = self.hybrid.decrypt_workloads_batch(self.packages, attestation=self.attestation)
+        self.assertEqual([r["data"] for r in results], [b"a", b"b", b"c"])
+
+    def test_verify_rejects_reorder_drop_and_duplicate(self):
+        a, b, c = self.packages
+        for packages in ([b, a, c], [a, b], [a, b, c, c], [a, b, b]):
+            self.assertFalse(self.hybrid.verify_batch(packages, self.attestation))
+
+    def test_verify_rejects_altered_ciphertext(self):
+        forged = dict(self.packages[0])
+        data = bytearray(forged["encrypted_data"])
+        data[self.hybrid.aes_manager.nonce_size] ^= 1
+        forged["encrypted_data"] = bytes(data)
+        self.assertFalse(self.hybrid.verify_batch([forged] + self.packages[1:], self.attestation))
+
+if __name__ == "__main__":
+    unittest.main()